@@ -1,4 +1,8 @@
+from collections.abc import Mapping
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
 
 
 class FileFormat(Enum):
@@ -13,17 +17,42 @@ class FileFormat(Enum):
     UNKNOWN_ZIP = "unknown_zip"
 
     @classmethod
+    @lru_cache(maxsize=2**15)
     def detect_from_filename(cls, filename: str) -> "FileFormat":
         """ファイル名から形式を判定."""
-        if filename.lower().endswith(("_geojson.zip", ".geojson")):
-            return cls.GEOJSON
-        if filename.lower().endswith(("_shp.zip", ".shp")):
-            return cls.SHAPEFILE
-        if filename.lower().endswith(("_gml.zip", ".gml")):
-            return cls.GML
-        if filename.lower().endswith(".zip"):
-            return cls.UNKNOWN_ZIP
-        return cls.OTHER
+        # 末尾から接尾辞トライ木を辿り、最も長く一致した接尾辞の形式を採用する
+        detected = cls.OTHER
+        node = _SUFFIX_TRIE
+        for char in reversed(filename.lower()):
+            node = node.get(char)
+            if node is None:
+                break
+            detected = node.get(None, detected)
+        return detected
+
+
+def _build_suffix_trie(suffix_formats: dict[str, FileFormat]) -> dict[Any, Any]:
+    """接尾辞を逆順に格納したトライ木を構築. 終端ノードはキーNoneに形式を持つ."""
+    trie: dict[Any, Any] = {}
+    for suffix, file_format in suffix_formats.items():
+        node = trie
+        for char in reversed(suffix):
+            node = node.setdefault(char, {})
+        node[None] = file_format
+    return trie
+
+
+_SUFFIX_TRIE = _build_suffix_trie(
+    {
+        "_geojson.zip": FileFormat.GEOJSON,
+        ".geojson": FileFormat.GEOJSON,
+        "_shp.zip": FileFormat.SHAPEFILE,
+        ".shp": FileFormat.SHAPEFILE,
+        "_gml.zip": FileFormat.GML,
+        ".gml": FileFormat.GML,
+        ".zip": FileFormat.UNKNOWN_ZIP,
+    },
+)
 
 
 class RegionType(Enum):
@@ -53,19 +82,26 @@ class RegionManager:
         "沖縄地方": ["沖縄"],
     }
 
-    _prefecture_to_region: dict[str, str] = {
-        prefecture: region for region, prefectures in REGION_MAP.items() for prefecture in prefectures
-    }
+    # 引き表はクラス定義時に一度だけ構築し、読み取り専用にする
+    _prefecture_to_region: Mapping[str, str] = MappingProxyType(
+        {prefecture: region for region, prefectures in REGION_MAP.items() for prefecture in prefectures},
+    )
+
+    # 地域名 -> 種類 の一括引き表 (全国・地方・都道府県)
+    _type_map: Mapping[str, RegionType] = MappingProxyType(
+        {
+            "全国": RegionType.NATIONWIDE,
+            **{region: RegionType.REGIONAL for region in REGION_MAP},
+            **{prefecture: RegionType.PREFECTURAL for prefecture in _prefecture_to_region},
+        },
+    )
 
     @classmethod
+    @lru_cache(maxsize=2**15)
     def get_region_type(cls, area_name: str) -> RegionType:
         """地域名から種類を判定."""
-        if area_name == "全国":
-            return RegionType.NATIONWIDE
-        if area_name in cls.REGION_MAP:
-            return RegionType.REGIONAL
-        if area_name in cls._prefecture_to_region:
-            return RegionType.PREFECTURAL
+        if region_type := cls._type_map.get(area_name):
+            return region_type
         if area_name.endswith("局"):
             return RegionType.INFRASTRUCTURE
         if "メッシュ" in area_name:
@@ -73,6 +109,7 @@ class RegionManager:
         return RegionType.UNKNOWN
 
     @classmethod
+    @lru_cache(maxsize=2**15)
     def get_region(cls, area_name: str) -> str | None:
         """地域名から地方名を取得."""
         if area_name in cls.REGION_MAP:
@@ -1,9 +1,13 @@
-import json
+import re
 import sys
 from collections import defaultdict
 from collections.abc import Callable
 from collections.abc import Iterator
-from dataclasses import asdict
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from contextlib import ExitStack
 from dataclasses import dataclass
 from dataclasses import field
 from pathlib import Path
@@ -12,20 +16,38 @@ from typing import ClassVar
 from typing import Self
 from urllib.parse import urljoin
 
+import orjson
 import structlog
+import zstandard
+from rich.progress import MofNCompleteColumn
+from rich.progress import Progress
+from rich.progress import TaskID
 
 from src.base_class import FileFormat
 from src.base_class import RegionManager
 from src.base_class import RegionType
 from src.utils.downloader import Downloader
+from src.utils.downloader import ProgressManager
 from src.utils.jp_year_converter import JapaneseCalendarConverter
 
 logger = structlog.get_logger(__name__)
 
 jp_converter = JapaneseCalendarConverter()
 
+# この拡張子で保存する場合はzstdで圧縮する
+ZSTD_SUFFIX = ".zst"
+ZSTD_LEVEL = 3
 
-@dataclass
+# 保存時の列挙値の表記. 従来のstr(Enum)と同じ "FileFormat.GML" 形式を、レコードごとに組み立てず表から引く
+_ENUM_LABELS: dict[FileFormat | RegionType, str] = {
+    member: str(member) for enum in (FileFormat, RegionType) for member in enum
+}
+
+# 括弧 (半角・全角) より前の部分
+_BEFORE_PAREN_RE = re.compile(r"[^(（]*")
+
+
+@dataclass(slots=True)
 class GeographicDataset:
     """地理データセットを表現するデータクラス."""
 
@@ -36,15 +58,22 @@ class GeographicDataset:
     year: int | None
     geodetic_system: str
     file_url: str
-    detail_url: str
     local_html: str
-    download_path: str
     _format: FileFormat = field(init=False)
     _region_type: RegionType = field(init=False)
+    _download_path: str | None = field(default=None, init=False, repr=False, compare=False)
 
     BASE_URL: ClassVar[str] = "https://nlftp.mlit.go.jp/ksj/gml/data/"
+    DETAIL_BASE_URL: ClassVar[str] = "https://nlftp.mlit.go.jp/ksj/gml/datalist/"
+    # 他のフィールドから導出されるため、保存データからは読み込まないキー
+    _DERIVED_KEYS: ClassVar[frozenset[str]] = frozenset(("_format", "_region_type", "detail_url", "download_path"))
+    _downloader: ClassVar[Downloader | None] = None
 
     def __post_init__(self):
+        # カタログ内で同じ値が大量に繰り返されるため、文字列を共有する
+        self.category = sys.intern(self.category)
+        self.geodetic_system = sys.intern(self.geodetic_system)
+        self.region = sys.intern(self.region)
         self._format = FileFormat.detect_from_filename(self.filename)
         self._region_type = RegionManager.get_region_type(self.region)
 
@@ -56,12 +85,52 @@ class GeographicDataset:
     def region_type(self) -> RegionType:
         return self._region_type
 
+    @property
+    def detail_url(self) -> str:
+        """カタログ詳細ページのURL."""
+        return self.DETAIL_BASE_URL + Path(self.local_html).name
+
+    @property
+    def download_path(self) -> str:
+        """ダウンロード先のパス (初回参照時に生成).
+
+        <data_dir>/catalogs/<category>/<html> に対して <data_dir>/raw_data/<category>/<filename>
+        """
+        if self._download_path is None:
+            local_html_path = Path(self.local_html)
+            self._download_path = str(
+                local_html_path.parent.parent.parent / "raw_data" / local_html_path.parent.name / self.filename,
+            )
+        return self._download_path
+
+    def to_json_dict(self) -> dict[str, Any]:
+        """JSON保存用の辞書に変換."""
+        return {
+            "category": self.category,
+            "filename": self.filename,
+            "file_size": self.file_size,
+            "region": self.region,
+            "year": self.year,
+            "geodetic_system": self.geodetic_system,
+            "file_url": self.file_url,
+            "detail_url": self.detail_url,
+            "local_html": self.local_html,
+            "download_path": self.download_path,
+            "_format": _ENUM_LABELS[self._format],
+            "_region_type": _ENUM_LABELS[self._region_type],
+        }
+
+    @classmethod
+    def from_json_dict(cls, data: dict[str, Any]) -> Self:
+        """to_json_dictで保存した辞書からインスタンスを生成."""
+        return cls(**{key: value for key, value in data.items() if key not in cls._DERIVED_KEYS})
+
     @staticmethod
     def read_year(data: dict[str, Any]) -> int | None:
         """年度データの読み取り."""
         for key in ["年度", "年"]:
             if value := data.get(key):
-                value = value.split("(")[0].split("（")[0].strip()
+                value = _BEFORE_PAREN_RE.match(value).group().strip()  # pyright: ignore [reportOptionalMemberAccess]
                 year_i = jp_converter.to_western_year(value)
                 if not year_i:
                     try:
@@ -79,7 +148,7 @@ class GeographicDataset:
         """地域データの読み取り."""
         for key in ["地域", "メッシュ番号"]:
             if value := data.get(key):
-                return value.split("(")[0].split("（")[0].strip()
+                return _BEFORE_PAREN_RE.match(value).group().strip()  # pyright: ignore [reportOptionalMemberAccess]
         msg = "地域情報が見つかりません"
         raise ValueError(msg)
 
@@ -96,24 +165,39 @@ class GeographicDataset:
                 geodetic_system=data.get("測地系", data["説明"]),
                 file_url=urljoin(cls.BASE_URL, data["file_path"]),
                 local_html=str(local_html_path),
-                detail_url="https://nlftp.mlit.go.jp/ksj/gml/datalist/" + local_html_path.name,
-                download_path=str(
-                    local_html_path.parent.parent.parent
-                    / "raw_data"
-                    / local_html_path.parent.name
-                    / data["ファイル名"],
-                ),
             )
         except KeyError as e:
             msg = f"必須キーが存在しません: {e}"
             logger.exception(msg, data=data, local_html_path=local_html_path)
             raise ValueError(msg) from e
 
-    def download(self) -> None:
-        """ファイルのダウンロード."""
-        downloader = Downloader()
-        path = Path(self.download_path)
-        if path.exists():
+    @classmethod
+    def _get_downloader(cls) -> Downloader:
+        """全データセットで共有するDownloaderを取得.
+
+        複数スレッドから同時に使うため、ファイルごとの進捗表示は行わない.
+        """
+        if cls._downloader is None:
+            cls._downloader = Downloader(progress_manager=ProgressManager(disable=True))
+        return cls._downloader
+
+    def download(
+        self,
+        downloader: Downloader | None = None,
+        *,
+        path: Path | None = None,
+        check_exists: bool = True,
+    ) -> None:
+        """ファイルのダウンロード.
+
+        Args:
+            downloader: 使用するDownloader. 省略時は共有インスタンス
+            path: 保存先. 呼び出し側で生成済みのPathを渡すと再生成しない
+            check_exists: Falseの場合、呼び出し側で確認済みとして存在確認を省略する
+        """
+        downloader = downloader or self._get_downloader()
+        path = path or Path(self.download_path)
+        if check_exists and path.exists():
             logger.info("ファイルが既に存在します", path=str(path))
             return None
         return downloader.download(self.file_url, path, FileFormat.BINARY)
@@ -125,11 +209,78 @@ class DatasetCollection:
 
     items: list[GeographicDataset] = field(default_factory=list)
 
-    def download(self):
+    @staticmethod
+    def create_progress() -> Progress:
+        """コレクションごとのダウンロード件数を表示するProgress."""
+        return Progress(*Progress.get_default_columns(), MofNCompleteColumn())
+
+    def download(
+        self,
+        downloader: Downloader | None = None,
+        *,
+        max_workers: int = 16,
+        executor: Executor | None = None,
+        progress: Progress | None = None,
+    ) -> None:
+        """未取得のデータセットを並列にダウンロード.
+
+        Args:
+            downloader: 全スレッドで共有するDownloader. 省略時はGeographicDatasetの共有インスタンス
+            max_workers: executorを省略した場合に作成するスレッドプールの並列数
+            executor: ダウンロードを実行するExecutor. 複数のコレクションで共有すると全体の同時接続数を制限できる
+            progress: 進捗を表示するProgress. 省略時はこのコレクション用に作成する
+        """
+        targets = self._download_targets()
+        if not targets:
+            return
+
+        downloader = downloader or GeographicDataset._get_downloader()  # noqa: SLF001
+        with ExitStack() as stack:
+            if executor is None:
+                executor = stack.enter_context(ThreadPoolExecutor(max_workers=max_workers))
+            # 共有のProgressではこのコレクションの行を完了後に取り除く
+            shared_progress = progress is not None
+            if progress is None:
+                progress = stack.enter_context(self.create_progress())
+
+            task_id = progress.add_task(self.items[0].category, total=len(targets))
+            futures = [
+                executor.submit(dataset.download, downloader, path=path, check_exists=False)
+                for path, dataset in targets.items()
+            ]
+            self._wait_downloads(futures, progress, task_id)
+            if shared_progress:
+                progress.remove_task(task_id)
+
+    def _download_targets(self) -> dict[Path, "GeographicDataset"]:
+        """未取得のデータセットを保存先ごとに1件ずつ集め、保存先のディレクトリを作成."""
+        # 存在確認はデータセットごとに1回だけ行い、ディレクトリ作成もまとめて行う
+        # 同じ保存先のデータセットが並行して同じ一時ファイルに書き込まないよう、保存先ごとに最初の1件だけを残す
+        targets: dict[Path, GeographicDataset] = {}
+        directories: set[Path] = set()
         for dataset in self.items:
-            if not Path(dataset.download_path).exists():
-                Path(dataset.download_path).parent.mkdir(parents=True, exist_ok=True)
-                dataset.download()
+            path = Path(dataset.download_path)
+            if path in targets:
+                logger.info("重複データセットをスキップ", path=str(path))
+                continue
+            if not path.exists():
+                targets[path] = dataset
+                directories.add(path.parent)
+        for directory in directories:
+            directory.mkdir(parents=True, exist_ok=True)
+        return targets
+
+    @staticmethod
+    def _wait_downloads(futures: list[Future[None]], progress: Progress, task_id: TaskID) -> None:
+        """ダウンロードの完了を待ちながら進捗を進める. 失敗した場合は未着手のダウンロードを取り消す."""
+        try:
+            for future in as_completed(futures):
+                future.result()
+                progress.advance(task_id)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
 
     def filter(self, predicate: Callable[[GeographicDataset], bool]) -> "DatasetCollection":
         """条件に合致するデータセットを抽出."""
@@ -181,26 +332,33 @@ class DatasetCollection:
         prefer_formats: list[FileFormat] | FileFormat | None,
     ) -> list[GeographicDataset]:
         """最適なデータセットを選択."""
-        without_seibikyoku = collection.filter(lambda x: x.region_type != RegionType.INFRASTRUCTURE)
-        filtered = without_seibikyoku if without_seibikyoku.items else collection
+        # 整備局以外・全国データへの振り分けを1パスで行う
+        without_seibikyoku: list[GeographicDataset] = []
+        nationwide: list[GeographicDataset] = []
+        for item in collection.items:
+            region_type = item.region_type
+            if region_type is RegionType.INFRASTRUCTURE:
+                continue
+            without_seibikyoku.append(item)
+            if region_type is RegionType.NATIONWIDE:
+                nationwide.append(item)
 
-        # 全国データの確認
-        nationwide = filtered.filter_by_region_type(RegionType.NATIONWIDE)
-        if nationwide.items:
-            filtered = nationwide
+        filtered = nationwide or without_seibikyoku or collection.items
 
-        if prefer_formats and filtered.items:
+        if prefer_formats and filtered:
+            by_format: dict[FileFormat, list[GeographicDataset]] = defaultdict(list)
+            for item in filtered:
+                by_format[item.format].append(item)
             for prefer_format in [prefer_formats] if isinstance(prefer_formats, FileFormat) else prefer_formats:
-                format_filtered = filtered.filter_by_format(prefer_format)
-                if format_filtered.items:
-                    filtered = format_filtered
+                if prefer_format in by_format:
+                    filtered = by_format[prefer_format]
                     break
 
         # 地域の整理
-        if not nationwide.items:
-            filtered = self._organize_by_region(filtered)
+        if not nationwide:
+            return self._organize_by_region(DatasetCollection(items=filtered)).items
 
-        return filtered.items
+        return filtered
 
     @staticmethod
     def _organize_by_region(collection: "DatasetCollection") -> "DatasetCollection":
@@ -210,19 +368,22 @@ class DatasetCollection:
         if not collection.items:
             return collection
 
-        region_groups: dict[str, list[GeographicDataset]] = defaultdict(list)
+        # 地方ごとに (地方レベル, 都道府県レベル) へ1パスで振り分ける
+        region_groups: dict[str, tuple[list[GeographicDataset], list[GeographicDataset]]] = defaultdict(
+            lambda: ([], []),
+        )
         unclassified: list[GeographicDataset] = []
 
         for item in collection.items:
             if region := RegionManager.get_region(item.region):
-                region_groups[region].append(item)
+                region_level, sub_level = region_groups[region]
+                (region_level if item.region == region else sub_level).append(item)
             else:
                 unclassified.append(item)
 
         organized: list[GeographicDataset] = []
-        for region, group in region_groups.items():
-            region_level = [d for d in group if d.region == region]
-            organized.extend(region_level if region_level else group)
+        for region_level, sub_level in region_groups.values():
+            organized.extend(region_level or sub_level)
         organized.extend(unclassified)
 
         return DatasetCollection(items=organized)
@@ -231,12 +392,15 @@ class DatasetCollection:
         """年度でデータセットをグループ化."""
         groups: dict[int | str, list[GeographicDataset]] = defaultdict(list)
         for item in self.items:
-            if not item.year:
+            year = item.year
+            if not year:
                 groups["no_year"].append(item)
                 logger.warning("年度情報なし", dataset=item)
                 continue
-            groups[item.year].append(item)
-        return dict(groups)
+            groups[year].append(item)
+        # コピーせずに通常のdictとして振る舞わせる (未知キーでKeyError)
+        groups.default_factory = None  # pyright: ignore [reportAttributeAccessIssue]
+        return groups
 
     @staticmethod
     def _get_latest_year_group(
@@ -260,13 +424,16 @@ class DatasetCollection:
     def from_dicts(cls, data_list: list[dict[str, Any]], local_html_path: Path) -> "DatasetCollection":
         """辞書のリストからデータセットコレクションを生成."""
         items = []
-        errors = []
+        errors: list[str] | None = None  # エラー発生時のみ生成
+        from_dict = GeographicDataset.from_dict
+        append = items.append
 
         for i, data in enumerate(data_list):
             try:
-                dataset = GeographicDataset.from_dict(data, local_html_path)
-                items.append(dataset)
+                append(from_dict(data, local_html_path))
             except ValueError as e:
+                if errors is None:
+                    errors = []
                 errors.append(f"インデックス {i} でエラー: {e}")
 
         if errors:
@@ -277,32 +444,27 @@ class DatasetCollection:
     def merge_with_existing(self, existing_items: list[dict]) -> list[GeographicDataset]:
         """既存のデータと新しいデータをマージします."""
         # 既存のデータをGeographicDatasetオブジェクトに変換
-        existing_datasets = []
-        for geo_data in existing_items:
-            _ = geo_data.pop("_format", None)  # Auto added by the class
-            _ = geo_data.pop("_region_type", None)  # Auto added by the class
-            dataset = GeographicDataset(**geo_data)
-            existing_datasets.append(dataset)
-
-        def get_dataset_key(dataset: GeographicDataset) -> tuple:
-            """データセットを一意に識別するキーを生成."""
-            return (
-                dataset.category,  # カテゴリ
-                dataset.filename,  # ファイル名
-                dataset.region,  # 地域
-                dataset.year,  # 年度
-                dataset.geodetic_system,  # 測地系
-                str(dataset.format),  # ファイルフォーマット
-                str(dataset.region_type),  # 地域タイプ
-            )
+        existing_datasets = [GeographicDataset.from_json_dict(geo_data) for geo_data in existing_items]
 
         # 既存のデータセットのキーを記録
-        existing_keys = {get_dataset_key(dataset) for dataset in existing_datasets}
+        # キー: (カテゴリ, ファイル名, 地域, 年度, 測地系, ファイルフォーマット, 地域タイプ)
+        existing_keys = {
+            (d.category, d.filename, d.region, d.year, d.geodetic_system, d.format.value, d.region_type.value)
+            for d in existing_datasets
+        }
 
         # 新しいデータを追加（重複を避ける）
         merged_datasets = existing_datasets.copy()
         for new_dataset in self.items:
-            new_key = get_dataset_key(new_dataset)
+            new_key = (
+                new_dataset.category,
+                new_dataset.filename,
+                new_dataset.region,
+                new_dataset.year,
+                new_dataset.geodetic_system,
+                new_dataset.format.value,
+                new_dataset.region_type.value,
+            )
             if new_key not in existing_keys:
                 merged_datasets.append(new_dataset)
                 existing_keys.add(new_key)
@@ -317,44 +479,33 @@ class DatasetCollection:
 
         return merged_datasets
 
-    def save(self, file_path: Path) -> None:
-        """データセットコレクションをJSONファイルとして保存する."""
+    def save(self, file_path: Path) -> "DatasetCollection":
+        """データセットコレクションをJSONファイルとして保存する.
+
+        Returns:
+            既存データとマージし重複を除いた、保存した内容と同じコレクション
+        """
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
         existing_data = []
         if file_path.exists():
             try:
-                with file_path.open("r", encoding="utf-8") as f:
-                    existing_data = json.load(f)
+                existing_data = self._read_json(file_path)
                 logger.info(
                     "既存のデータファイルを読み込みました",
                     file_path=str(file_path),
                     existing_records=len(existing_data),
                 )
-            except json.JSONDecodeError as e:
+            except (orjson.JSONDecodeError, zstandard.ZstdError) as e:
                 logger.warning("既存のJSONファイルの読み込みに失敗しました", error=str(e), file_path=str(file_path))
                 existing_data = []
 
         try:
-            current_data = []
-            for dataset in self.items:
-                data_dict = asdict(dataset)
-                # format と region_type を文字列に変換
-                data_dict["_format"] = str(dataset.format)
-                data_dict["_region_type"] = str(dataset.region_type)
-                current_data.append(data_dict)
-
             merged_datasets = self.merge_with_existing(existing_data)
 
-            serializable_data = []
-            for dataset in merged_datasets:
-                data_dict = asdict(dataset)
-                data_dict["_format"] = str(dataset.format)
-                data_dict["_region_type"] = str(dataset.region_type)
-                serializable_data.append(data_dict)
+            serializable_data = [dataset.to_json_dict() for dataset in merged_datasets]
 
-            with file_path.open("w", encoding="utf-8") as f:
-                json.dump(serializable_data, f, ensure_ascii=False, indent=2)
+            self._write_json(file_path, serializable_data)
 
             logger.info(
                 "データを保存しました",
@@ -367,7 +518,7 @@ class DatasetCollection:
             logger.exception("JSONシリアライズエラー", error=str(e), file_path=str(file_path))
             for i, item in enumerate(serializable_data):
                 try:
-                    json.dumps(item)
+                    orjson.dumps(item)
                 except TypeError as e:
                     logger.exception("データシリアライズエラー", index=i, error=str(e), data=item)
             raise
@@ -375,19 +526,33 @@ class DatasetCollection:
             logger.exception("ファイル保存エラー", error=str(e), file_path=str(file_path))
             raise
 
+        return DatasetCollection(items=merged_datasets)
+
     @classmethod
     def load(cls, file_path: Path) -> "DatasetCollection":
-        with file_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-            items = []
+        data = cls._read_json(file_path)
+        return cls([GeographicDataset.from_json_dict(geo_data) for geo_data in data])
 
-            for geo_data in data:
-                _ = geo_data.pop("_format", None)
-                _ = geo_data.pop("_region_type", None)
-                dataset = GeographicDataset(**geo_data)
-                items.append(dataset)
+    @staticmethod
+    def _read_json(file_path: Path) -> Any:
+        """JSONファイルを読み込む. 拡張子が.zstの場合は展開してから読む."""
+        data = file_path.read_bytes()
+        if file_path.suffix == ZSTD_SUFFIX:
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return orjson.loads(data)
 
-            return cls(items)
+    @staticmethod
+    def _write_json(file_path: Path, serializable_data: list[dict[str, Any]]) -> None:
+        """JSONファイルを書き込む. 拡張子が.zstの場合はzstdで圧縮する."""
+        if file_path.suffix == ZSTD_SUFFIX:
+            data = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(orjson.dumps(serializable_data))
+        else:
+            data = orjson.dumps(serializable_data, option=orjson.OPT_INDENT_2)
+
+        # 書き込み途中で中断されても既存ファイルが壊れないよう、一時ファイルから置き換える
+        temp_path = file_path.with_name(file_path.name + ".tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(file_path)
 
     def __len__(self) -> int:
         return len(self.items)
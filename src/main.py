@@ -1,4 +1,5 @@
 import sys
+from dataclasses import asdict
 from typing import Any
 
 import fire
@@ -62,7 +63,7 @@ def main() -> None:
     try:
         configure_logger(10)
         config = CLIManager.create_config()
-        logger.info("Configuration loaded", config=vars(config))
+        logger.info("Configuration loaded", config=asdict(config))
 
         downloader = Downloader()
         sc_manager = ScraypingManager(config, downloader)
@@ -83,7 +84,7 @@ def main() -> None:
         }  # pyright: ignore [reportUndefinedVariable]
         extra_catalogs = [CatalogItem(relative_url, title) for title, relative_url in extras.items()]
         catalog_manager.add_extra_catalogs(extra_catalogs)
-        catalog_manager.download_catalogs(sc_manager.paths["catalogs"])
+        catalog_manager.download_catalogs(sc_manager.paths.catalogs)
 
         catalog_processor = CatalogProcessor(catalog_manager, sc_manager.paths, config)
         catalog_processor.process_catalog_files()
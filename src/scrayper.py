@@ -4,16 +4,25 @@ from dataclasses import field
 from enum import Enum
 from pathlib import Path
 from typing import Any
+from typing import NamedTuple
 
 import structlog
 
 from src.base_class import FileFormat
+from src.utils.downloader import DEFAULT_CHUNK_SIZE
 from src.utils.downloader import Downloader
+from src.utils.pickle_cache import load_cache
+from src.utils.pickle_cache import save_cache
 from src.web_catalog import CatalogItem
 from src.web_catalog import CatalogManager
 
 logger = structlog.get_logger().bind(module="scrayper")
 
+# CatalogManager / CatalogItem の構造を変更した場合は更新し、古いキャッシュを無効化する
+CATALOG_CACHE_VERSION = 3
+
+FORMAT_BY_VALUE: dict[str, FileFormat] = {file_format.value: file_format for file_format in FileFormat}
+
 
 class DownloadError(Exception):
     """ダウンロード関連のエラー."""
@@ -30,7 +39,15 @@ class DownloadMode(str, Enum):
     DRY_RUN = "dry_run"
 
 
-@dataclass
+class Paths(NamedTuple):
+    """データディレクトリ配下の各パス."""
+
+    catalogs: Path
+    catalog_top: Path
+    data_dir: Path
+
+
+@dataclass(slots=True)
 class ScraypingConfig:
     """ダウンロードの設定を保持するクラス."""
 
@@ -43,7 +60,7 @@ class ScraypingConfig:
     )
     target_catalogs: list[str] | None = None
     target_years: list[str] | None = None
-    chunk_size: int = 8192
+    chunk_size: int = DEFAULT_CHUNK_SIZE
     retry_count: int = 3
     retry_delay: float = 1.0
     timeout: float = 30.0
@@ -62,14 +79,12 @@ class ScraypingConfig:
             data_dir = cls._get_external_data_dir()
 
         prefer_formats = args.get("prefer_format", ["geojson", "shapefile"])
-        try:
-            # condition check if str
-            if isinstance(prefer_formats, str):
-                prefer_formats = FileFormat(prefer_formats)
-            else:
-                prefer_formats = [FileFormat(format_str) for format_str in prefer_formats]
-        except ValueError:
-            prefer_formats = FileFormat.OTHER
+        # 未知の形式は例外を使わずに除外する. 有効な形式が無い場合はOTHER
+        if isinstance(prefer_formats, str):
+            prefer_formats = FORMAT_BY_VALUE.get(prefer_formats, FileFormat.OTHER)
+        else:
+            parsed = [file_format for value in prefer_formats if (file_format := FORMAT_BY_VALUE.get(value))]
+            prefer_formats = parsed if parsed or not prefer_formats else [FileFormat.OTHER]
 
         return cls(
             data_dir=Path(data_dir),
@@ -91,17 +106,20 @@ class ScraypingConfig:
 
 
 class ScraypingResult:
-    """ダウンロード結果を保持するクラス."""
+    """ダウンロード結果を保持するクラス.
+
+    記録時は値をタプルのまま保持し、辞書化はto_dictで行う.
+    """
 
     def __init__(self):
-        self.downloads: list[dict[str, Any]] = []
-        self.directories_to_create: list[str] = []
-        self.files_to_process: list[dict[str, Any]] = []
-        self.skipped_items: list[dict[str, Any]] = []
+        self.downloads: list[tuple[str, str, Path, str]] = []
+        self.directories_to_create: list[Path] = []
+        self.files_to_process: list[tuple[str, Path, Path, str]] = []
+        self.skipped_items: list[tuple[str, str, str]] = []
 
     def add_directory(self, directory: Path) -> None:
         """作成するディレクトリを追加."""
-        self.directories_to_create.append(str(directory))
+        self.directories_to_create.append(directory)
 
     def add_download(
         self,
@@ -111,14 +129,7 @@ class ScraypingResult:
         file_type: str,
     ) -> None:
         """ダウンロード情報を追加."""
-        self.downloads.append(
-            {
-                "type": download_type,
-                "url": url,
-                "path": str(path),
-                "file_type": file_type,
-            },
-        )
+        self.downloads.append((download_type, url, path, file_type))
 
     def add_file_to_process(
         self,
@@ -128,26 +139,28 @@ class ScraypingResult:
         catalog: str,
     ) -> None:
         """処理するファイル情報を追加."""
-        self.files_to_process.append(
-            {
-                "action": action,
-                "input": str(input_path),
-                "output": str(output_path),
-                "catalog": catalog,
-            },
-        )
+        self.files_to_process.append((action, input_path, output_path, catalog))
 
     def add_skipped_item(self, item_type: str, title: str, reason: str) -> None:
         """スキップしたアイテムを追加."""
-        self.skipped_items.append({"type": item_type, "title": title, "reason": reason})
+        self.skipped_items.append((item_type, title, reason))
 
     def to_dict(self) -> dict[str, Any]:
         """結果を辞書形式で取得."""
         return {
-            "downloads": self.downloads,
-            "directories_to_create": self.directories_to_create,
-            "files_to_process": self.files_to_process,
-            "skipped_items": self.skipped_items,
+            "downloads": [
+                {"type": download_type, "url": url, "path": str(path), "file_type": file_type}
+                for download_type, url, path, file_type in self.downloads
+            ],
+            "directories_to_create": [str(directory) for directory in self.directories_to_create],
+            "files_to_process": [
+                {"action": action, "input": str(input_path), "output": str(output_path), "catalog": catalog}
+                for action, input_path, output_path, catalog in self.files_to_process
+            ],
+            "skipped_items": [
+                {"type": item_type, "title": title, "reason": reason}
+                for item_type, title, reason in self.skipped_items
+            ],
             "summary": self._create_summary(),
         }
 
@@ -174,38 +187,53 @@ class ScraypingManager:
         self.result = ScraypingResult()
 
     @staticmethod
-    def _setup_paths(data_dir: Path) -> dict[str, Path]:
+    def _setup_paths(data_dir: Path) -> Paths:
         """Set up path information."""
-        return {
-            "catalogs": data_dir / "catalogs",
-            "catalog_top": data_dir / "catalog_top" / "index.html",
-            "data_dir": data_dir / "raw_data",
-        }
+        return Paths(
+            catalogs=data_dir / "catalogs",
+            catalog_top=data_dir / "catalog_top" / "index.html",
+            data_dir=data_dir / "raw_data",
+        )
 
     def setup_directories(self) -> None:
         """Create necessary directories."""
-        self.result.add_directory(self.paths["catalogs"])
-        self.result.add_directory(self.paths["catalog_top"])
+        self.result.add_directory(self.paths.catalogs)
+        self.result.add_directory(self.paths.catalog_top)
 
     def process_catalog_top(self) -> None:
         """Process catalog top page."""
-        if not self.paths["catalog_top"].exists():
+        if not self.paths.catalog_top.exists():
             if self.config.is_dry_run:
                 self.result.add_download(
                     "catalog_top",
                     self.BASE_URL,
-                    self.paths["catalog_top"],
+                    self.paths.catalog_top,
                     "html",
                 )
             else:
-                self.paths["catalog_top"].parent.mkdir(parents=True, exist_ok=True)
-                self.downloader.download(self.BASE_URL, self.paths["catalog_top"], FileFormat.HTML)
+                self.paths.catalog_top.parent.mkdir(parents=True, exist_ok=True)
+                self.downloader.download(self.BASE_URL, self.paths.catalog_top, FileFormat.HTML)
 
     def initialize_catalog_manager(self) -> CatalogManager:
         """Initialize catalog manager."""
         if self.config.is_dry_run:
             return self._get_sample_catalog_manager()
-        return CatalogManager(self.paths["catalog_top"].read_text())
+        return self._load_or_build_catalog_manager(self.paths.catalog_top)
+
+    @staticmethod
+    def _load_or_build_catalog_manager(html_path: Path) -> CatalogManager:
+        """カタログ一覧を解析. HTMLの更新時刻とサイズが変わっていなければキャッシュを使う."""
+        stat = html_path.stat()
+        key = (CATALOG_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+        cache_path = html_path.with_suffix(".cache.pkl")
+
+        if (catalog_manager := load_cache(cache_path, key, CatalogManager)) is not None:
+            logger.info("Loaded cached catalog list", cache_path=str(cache_path))
+            return catalog_manager
+
+        catalog_manager = CatalogManager(html_path.read_text())
+        save_cache(cache_path, key, catalog_manager)
+        return catalog_manager
 
     @staticmethod
     def _get_sample_catalog_manager() -> CatalogManager:
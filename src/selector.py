@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import ClassVar
 from typing import Dict
 from typing import List
 from typing import Optional
@@ -14,7 +15,7 @@ from rich.table import Table
 from rich.text import Text
 
 
-@dataclass
+@dataclass(slots=True)
 class DataStatus:
     """データの保持状況を管理するクラス."""
 
@@ -26,12 +27,17 @@ class DataStatus:
 
     def any_data_exists(self) -> bool:
         """いずれかのデータが存在するかチェック."""
-        return any([self.name, self.catalog, self.selector, self.metadata, self.raw_data])
+        return self.name or self.catalog or self.selector or self.metadata or self.raw_data
 
 
 class CatalogSelector:
     """カタログ選択システム."""
 
+    # 描画のたびに生成しないよう、状態表示は共有のインスタンスを使う
+    _TEXT_OK: ClassVar[Text] = Text("✓", style="bold green")
+    _TEXT_NG: ClassVar[Text] = Text("✗", style="bold red")
+    _NO_DATA: ClassVar[str] = "[red]データなし[/red]"
+
     def __init__(self, catalog_names: list[str], data_status: dict[str, DataStatus]) -> None:
         self.catalog_names = catalog_names
         self.data_status = data_status
@@ -41,14 +47,6 @@ class CatalogSelector:
         """ヘッダーパネルを作成."""
         return Panel(Text(title, justify="center", style="bold blue"), box=ROUNDED, style="blue")
 
-    def get_status_symbol(self, status: bool) -> str:
-        """状態に応じたシンボルを返す."""
-        return "✓" if status else "✗"
-
-    def get_status_style(self, status: bool) -> str:
-        """状態に応じたスタイルを返す."""
-        return "bold green" if status else "bold red"
-
     def create_catalog_table(self) -> Table:
         """拡張されたカタログ一覧テーブルを作成."""
         table = Table(
@@ -73,16 +71,17 @@ class CatalogSelector:
         table.add_column("選択方法", style="yellow", width=20)
 
         # データの追加
+        ok, ng = self._TEXT_OK, self._TEXT_NG
         for idx, name in enumerate(self.catalog_names, start=1):
             status = self.data_status.get(name, DataStatus())
             table.add_row(
                 str(idx),
                 name,
-                Text(self.get_status_symbol(status.name), style=self.get_status_style(status.name)),
-                Text(self.get_status_symbol(status.catalog), style=self.get_status_style(status.catalog)),
-                Text(self.get_status_symbol(status.selector), style=self.get_status_style(status.selector)),
-                Text(self.get_status_symbol(status.metadata), style=self.get_status_style(status.metadata)),
-                Text(self.get_status_symbol(status.raw_data), style=self.get_status_style(status.raw_data)),
+                ok if status.name else ng,
+                ok if status.catalog else ng,
+                ok if status.selector else ng,
+                ok if status.metadata else ng,
+                ok if status.raw_data else ng,
                 "↓ 番号を入力" if idx == 1 else "",
             )
 
@@ -107,22 +106,22 @@ class CatalogSelector:
         for idx in selected_indices:
             name = self.catalog_names[idx]
             status = self.data_status.get(name, DataStatus())
-            status_text = []
 
             if status.any_data_exists():
-                if status.name:
-                    status_text.append("名前")
-                if status.catalog:
-                    status_text.append("カタログ")
-                if status.selector:
-                    status_text.append("セレクター")
-                if status.metadata:
-                    status_text.append("管理情報")
-                if status.raw_data:
-                    status_text.append("生データ")
+                status_text = [
+                    label
+                    for label, flag in (
+                        ("名前", status.name),
+                        ("カタログ", status.catalog),
+                        ("セレクター", status.selector),
+                        ("管理情報", status.metadata),
+                        ("生データ", status.raw_data),
+                    )
+                    if flag
+                ]
                 status_str = f"[green]保持: {', '.join(status_text)}[/green]"
             else:
-                status_str = "[red]データなし[/red]"
+                status_str = self._NO_DATA
 
             table.add_row(str(idx), name, status_str)
 
@@ -160,25 +159,37 @@ class CatalogSelector:
                 self.console.print("[yellow]選択をキャンセルしました[/yellow]")
                 return None
 
-            try:
-                selected_numbers = [int(num.strip()) - 1 for num in selection.split(",")]
-
-                if all(0 <= num < len(self.catalog_names) for num in selected_numbers):
-                    selected_indices = sorted(set(selected_numbers))
-                    self.console.print(self.create_result_table(selected_indices))
-
-                    confirm = Prompt.ask("\n選択を確定しますか?", choices=["y", "n"], default="y")
-                    if confirm.lower() == "y":
-                        return selected_indices
-
-                    self.console.print("[yellow]選択をやり直します[/yellow]")
-                    self.console.print()
-                    self.console.print(self.create_catalog_table())
-                    self.console.print(self.create_help_panel())
-                else:
-                    self.console.print(f"[red]エラー: 1から{len(self.catalog_names)}までの数字を入力してください[/red]")
-            except ValueError:
+            selected_indices = self._parse_selection(selection)
+            if selected_indices is None:
+                continue
+
+            self.console.print(self.create_result_table(selected_indices))
+
+            confirm = Prompt.ask("\n選択を確定しますか?", choices=["y", "n"], default="y")
+            if confirm.lower() == "y":
+                return selected_indices
+
+            self.console.print("[yellow]選択をやり直します[/yellow]")
+            self.console.print()
+            self.console.print(self.create_catalog_table())
+            self.console.print(self.create_help_panel())
+
+    def _parse_selection(self, selection: str) -> list[int] | None:
+        """カンマ区切りの番号を0始まりのインデックスに変換. 不正な入力はエラーを表示してNone."""
+        catalog_count = len(self.catalog_names)
+        selected: set[int] = set()
+        for raw_token in selection.split(","):
+            # 全角スペースやタブも取り除く
+            token = raw_token.strip()
+            if not token.isdecimal():
                 self.console.print("[red]エラー: 正しい形式で入力してください (例: 1,2,4)[/red]")
+                return None
+            number = int(token)
+            if not 1 <= number <= catalog_count:
+                self.console.print(f"[red]エラー: 1から{catalog_count}までの数字を入力してください[/red]")
+                return None
+            selected.add(number - 1)
+        return sorted(selected)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,20 @@
 import asyncio
+import os
+import queue
+import random
+import stat
 import time
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
 from dataclasses import dataclass
 from dataclasses import field
+from datetime import UTC
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 from typing import Final
 from typing import Protocol
+from typing import Self
 from urllib.parse import unquote
 from urllib.parse import urlparse
 
@@ -21,6 +29,13 @@ from rich.progress import TransferSpeedColumn
 
 from src.base_class import FileFormat
 
+try:
+    # 任意依存. Linuxではio_uring等を用いた非同期ファイル書き込みを行う
+    from aiofile import AIOFile
+    from aiofile import Writer
+except ImportError:
+    AIOFile = None
+
 type PathLike = Path | str
 type Headers = dict[str, str]
 
@@ -28,6 +43,10 @@ DEFAULT_USER_AGENT: Final[str] = "for Signate Competion user kasix"
 DEFAULT_ENCODING: Final[str] = "utf-8"
 TEMP_SUFFIX: Final[str] = ".tmp"
 DEFAULT_FILENAME: Final[str] = "downloaded_file"
+DEFAULT_CHUNK_SIZE: Final[int] = 64 * 1024
+FILE_MODE: Final[int] = 0o644
+PROGRESS_UPDATE_BYTES: Final[int] = 1 << 20
+PROGRESS_UPDATE_INTERVAL: Final[float] = 0.05  # 秒
 
 # configure_logger()
 logger = structlog.get_logger().bind(module="downloader")
@@ -52,8 +71,10 @@ class ProgressProtocol(Protocol):
 
 
 class ProgressManager:
-    def __init__(self) -> None:
+    def __init__(self, *, disable: bool = False) -> None:
         self._console = get_console()
+        # Richのライブ表示は同時に1つまでのため、並列ダウンロードでは無効化する
+        self._disable = disable
 
     def create_progress(self) -> Progress:
         return Progress(
@@ -62,6 +83,7 @@ class ProgressManager:
             TransferSpeedColumn(),
             TimeRemainingColumn(),
             console=self._console,
+            disable=self._disable,
         )
 
     def create_task(self, progress: Progress, total: int) -> TaskID:
@@ -81,12 +103,41 @@ class FileHandler:
         path.parent.mkdir(parents=True, exist_ok=True)
 
     @staticmethod
-    def get_save_path(url: str, base_path: PathLike) -> Path:
+    def resolve_save_path(url: str, base_path: PathLike) -> tuple[Path, bool]:
+        """保存先のパスと、そのファイルが既に存在するかを返す.
+
+        base_pathは1回だけstatし、ディレクトリの場合のみURLのファイル名を付けたパスを確認する.
+        """
         base_path = Path(base_path)
-        if base_path.is_dir():
-            filename = unquote(Path(urlparse(url).path).name) or DEFAULT_FILENAME
-            return base_path / filename
-        return base_path
+        try:
+            is_dir = stat.S_ISDIR(os.stat(base_path).st_mode)  # noqa: PTH116
+        except (FileNotFoundError, NotADirectoryError):
+            return base_path, False
+        if not is_dir:
+            return base_path, True
+
+        filename = unquote(Path(urlparse(url).path).name) or DEFAULT_FILENAME
+        save_path = base_path / filename
+        return save_path, os.path.exists(save_path)  # noqa: PTH110
+
+    @staticmethod
+    def open_for_write(path: Path) -> int:
+        """バッファを介さずに書き込むため、ファイルをfdで開く."""
+        return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, FILE_MODE)
+
+    @staticmethod
+    def write_all(fd: int, data: bytes) -> None:
+        """部分書き込みを考慮し、データをすべてfdに書き込む."""
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+
+    @staticmethod
+    def drop_page_cache(fd: int) -> None:
+        """書き込み済みページが不要になったことをOSに通知する."""
+        # 連続ダウンロードでページキャッシュを圧迫しないよう、対応環境 (Linux) でのみ解放を通知
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
 
     @staticmethod
     async def read_file_async(path: PathLike, encoding: str = DEFAULT_ENCODING) -> str:
@@ -104,19 +155,22 @@ class FileHandler:
             raise DownloaderError(msg) from e
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class DownloadConfig:
     """ダウンロードの設定を保持するクラス."""
 
-    chunk_size: int = 8192
+    chunk_size: int = DEFAULT_CHUNK_SIZE
     retry_count: int = 3
     retry_delay: float = 1.0
+    max_retry_delay: float = 30.0
     timeout: float = 30.0
     encoding: str = "utf-8"
     user_agent: str = "CityGML Downloader/1.0"
     mock: bool = False
     data_dir: Path | None = None
     download_all: bool = False
+    # 一時ファイルからの置き換えで途中のファイルは残らないため、既定ではfsyncしない
+    fsync: bool = False
     latest_year_only: bool = True
     prefer_formats: list[FileFormat] | FileFormat = field(
         default_factory=lambda: [FileFormat.GEOJSON, FileFormat.SHAPEFILE],
@@ -146,38 +200,59 @@ class DownloadConfig:
 
 
 class DownloadRecord:
-    """ダウンロード記録を保持するクラス."""
+    """ダウンロード記録を保持するクラス.
+
+    記録時は値をタプルのまま保持し、辞書化・時刻の整形はto_dictで行う.
+    """
 
     def __init__(self):
-        self.downloads: list[dict[str, Any]] = []
-        self.processed_files: list[dict[str, Any]] = []
-        self.skipped_items: list[dict[str, Any]] = []
-        self.errors: list[dict[str, Any]] = []
+        self.downloads: list[tuple[str, Path, FileFormat, int]] = []
+        self.processed_files: list[tuple[str, Path, Path, int]] = []
+        self.skipped_items: list[tuple[str, str, str, int]] = []
+        self.errors: list[tuple[str, str, dict[str, Any], int]] = []
 
     def add_download(self, url: str, path: Path, file_type: FileFormat) -> None:
-        self.downloads.append(
-            {"url": url, "path": str(path), "type": str(file_type), "timestamp": datetime.now().isoformat()},
-        )
+        self.downloads.append((url, path, file_type, time.time_ns()))
 
     def add_processed_file(self, action: str, input_path: Path, output_path: Path) -> None:
-        self.processed_files.append(
-            {
-                "action": action,
-                "input": str(input_path),
-                "output": str(output_path),
-                "timestamp": datetime.now().isoformat(),
-            },
-        )
+        self.processed_files.append((action, input_path, output_path, time.time_ns()))
 
     def add_skipped_item(self, item_type: str, item_id: str, reason: str) -> None:
-        self.skipped_items.append(
-            {"type": item_type, "id": item_id, "reason": reason, "timestamp": datetime.now().isoformat()},
-        )
+        self.skipped_items.append((item_type, item_id, reason, time.time_ns()))
 
     def add_error(self, error_type: str, message: str, details: dict[str, Any]) -> None:
-        self.errors.append(
-            {"type": error_type, "message": message, "details": details, "timestamp": datetime.now().isoformat()},
-        )
+        self.errors.append((error_type, message, details, time.time_ns()))
+
+    def to_dict(self) -> dict[str, list[dict[str, Any]]]:
+        """記録を辞書形式で取得."""
+        return {
+            "downloads": [
+                {"url": url, "path": str(path), "type": str(file_type), "timestamp": self._format_timestamp(ns)}
+                for url, path, file_type, ns in self.downloads
+            ],
+            "processed_files": [
+                {
+                    "action": action,
+                    "input": str(input_path),
+                    "output": str(output_path),
+                    "timestamp": self._format_timestamp(ns),
+                }
+                for action, input_path, output_path, ns in self.processed_files
+            ],
+            "skipped_items": [
+                {"type": item_type, "id": item_id, "reason": reason, "timestamp": self._format_timestamp(ns)}
+                for item_type, item_id, reason, ns in self.skipped_items
+            ],
+            "errors": [
+                {"type": error_type, "message": message, "details": details, "timestamp": self._format_timestamp(ns)}
+                for error_type, message, details, ns in self.errors
+            ],
+        }
+
+    @staticmethod
+    def _format_timestamp(ns: int) -> str:
+        """従来のdatetime.now().isoformat()と同じく、オフセットを付けないローカル時刻で表す."""
+        return datetime.fromtimestamp(ns / 1e9, tz=UTC).astimezone().replace(tzinfo=None).isoformat()
 
 
 class Downloader:
@@ -192,6 +267,12 @@ class Downloader:
         self.progress_manager = progress_manager or ProgressManager()
         self.file_handler = FileHandler()
         self.record = DownloadRecord()
+        # 同一ホストへの接続をkeep-aliveで使い回すため、クライアントはインスタンスで共有する
+        self._client = httpx.Client(
+            timeout=self.config.timeout,
+            headers=self.headers,
+            limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60),
+        )
         self.log = logger.bind(
             chunk_size=self.config.chunk_size,
             retry_count=self.config.retry_count,
@@ -199,6 +280,16 @@ class Downloader:
             mock=self.config.mock,
         )
 
+    def close(self) -> None:
+        """HTTPクライアントの接続を解放."""
+        self._client.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     def download(
         self,
         url: str,
@@ -207,47 +298,112 @@ class Downloader:
     ) -> None:
         log = self.log.bind(url=url, save_path=str(save_path), file_type=file_type.name)
 
-        save_path = self.file_handler.get_save_path(url, save_path)
+        save_path = self._resolve_target(url, save_path, file_type, log)
+        if save_path is None:
+            return
 
-        if self.config.mock:
-            if save_path.exists() and not self.config.download_all:
-                log.warning("file_exists")
-                self.record.add_skipped_item("file", str(save_path), "File already exists")
+        temp_path = save_path.with_name(save_path.name + TEMP_SUFFIX)
+
+        for attempt in range(self.config.retry_count):
+            try:
+                self._perform_download(url, save_path, temp_path, file_type)
+                self.record.add_download(url, save_path, file_type)
+                log.info("download_completed")
                 return
-            self.record.add_download(url, Path(save_path), file_type)
-            log.info("mock_download_recorded")
-            return
+            except httpx.HTTPError as e:
+                time.sleep(self._handle_download_error(e, temp_path, url, attempt))
+            except Exception as e:
+                self._handle_unexpected_error(e, temp_path, url, save_path, log)
+                raise
+
+    async def download_many(
+        self,
+        items: Iterable[tuple[str, PathLike]],
+        file_type: FileFormat = FileFormat.BINARY,
+        max_concurrency: int = 8,
+    ) -> list[BaseException | None]:
+        """複数のURLを非同期に並列ダウンロード.
+
+        Args:
+            items: (URL, 保存先) の組
+            file_type: ファイル形式
+            max_concurrency: 同時ダウンロード数の上限
+
+        Returns:
+            itemsと同じ順の結果. 成功・スキップ時はNone, 失敗時は発生した例外
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
 
-        if save_path.exists() and not self.config.download_all:
+        async with httpx.AsyncClient(timeout=self.config.timeout, headers=self.headers, limits=limits) as client:
+
+            async def bounded_download(url: str, save_path: PathLike) -> None:
+                async with semaphore:
+                    await self._download_async(client, url, save_path, file_type)
+
+            return await asyncio.gather(
+                *(bounded_download(url, save_path) for url, save_path in items),
+                return_exceptions=True,
+            )
+
+    def _resolve_target(
+        self,
+        url: str,
+        save_path: PathLike,
+        file_type: FileFormat,
+        log: Any,
+    ) -> Path | None:
+        """保存先を決定し、ディレクトリを準備. ダウンロード不要 (既存・モック) の場合はNone."""
+        # 存在確認 (stat) は1回だけ行い、モック・実ダウンロードの両方で使う
+        save_path, exists = self.file_handler.resolve_save_path(url, save_path)
+        if exists and not self.config.download_all:
             log.warning("file_exists")
             self.record.add_skipped_item("file", str(save_path), "File already exists")
-            return
+            return None
+
+        if self.config.mock:
+            self.record.add_download(url, save_path, file_type)
+            log.info("mock_download_recorded")
+            return None
 
         self.file_handler.ensure_directory(save_path)
-        temp_path = save_path.with_suffix(save_path.suffix + ".tmp")
+        return save_path
+
+    async def _download_async(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        save_path: PathLike,
+        file_type: FileFormat,
+    ) -> None:
+        log = self.log.bind(url=url, save_path=str(save_path), file_type=file_type.name)
+
+        save_path = self._resolve_target(url, save_path, file_type, log)
+        if save_path is None:
+            return
+
+        temp_path = save_path.with_name(save_path.name + TEMP_SUFFIX)
 
         for attempt in range(self.config.retry_count):
             try:
-                self._perform_download(url, save_path, temp_path, file_type)
+                if file_type == FileFormat.HTML:
+                    await self._download_html_async(client, url, save_path)
+                else:
+                    await self._download_binary_async(client, url, temp_path)
+                    temp_path.rename(save_path)
                 self.record.add_download(url, save_path, file_type)
                 log.info("download_completed")
                 return
             except httpx.HTTPError as e:
-                self._handle_download_error(e, temp_path, url, attempt)
+                await asyncio.sleep(self._handle_download_error(e, temp_path, url, attempt))
             except Exception as e:
-                if temp_path.exists():
-                    temp_path.unlink()
-                log.exception("unexpected_error", error=str(e))
-                self.record.add_error("unexpected", str(e), {"url": url, "path": str(save_path)})
+                self._handle_unexpected_error(e, temp_path, url, save_path, log)
                 raise
 
     def get_download_record(self) -> dict[str, Any]:
         """ダウンロード記録を取得."""
         return {
-            "downloads": self.record.downloads,
-            "processed_files": self.record.processed_files,
-            "skipped_items": self.record.skipped_items,
-            "errors": self.record.errors,
+            **self.record.to_dict(),
             "configuration": {
                 "mock": self.config.mock,
                 "download_all": self.config.download_all,
@@ -270,14 +426,14 @@ class Downloader:
             file_type=file_type.name,
         )
 
-        with httpx.Client(timeout=self.config.timeout) as client:
-            if file_type == FileFormat.HTML:
-                log.debug("downloading_html")
-                self._download_html(client, url, save_path)
-            else:
-                log.debug("downloading_binary")
-                self._download_binary(client, url, temp_path)
-                temp_path.rename(save_path)
+        client = self._client
+        if file_type == FileFormat.HTML:
+            log.debug("downloading_html")
+            self._download_html(client, url, save_path)
+        else:
+            log.debug("downloading_binary")
+            self._download_binary(client, url, temp_path)
+            temp_path.rename(save_path)
 
     def _download_html(
         self,
@@ -301,10 +457,97 @@ class Downloader:
 
             with self.progress_manager.create_progress() as progress:
                 task_id = self.progress_manager.create_task(progress, total_size)
-                with temp_path.open("wb") as f:
+                # 進捗バーの更新はチャンクごとではなく、一定量・一定時間ごとにまとめて行う
+                pending = 0
+                last_update = time.monotonic()
+                # チャンク単位で既にバッファされているため、Pythonのバッファを介さずfdへ直接書き込む
+                fd = self.file_handler.open_for_write(temp_path)
+                try:
                     for chunk in response.iter_bytes(self.config.chunk_size):
-                        f.write(chunk)
-                        self.progress_manager.update(progress, task_id, len(chunk))
+                        self.file_handler.write_all(fd, chunk)
+                        pending += len(chunk)
+                        now = time.monotonic()
+                        if pending >= PROGRESS_UPDATE_BYTES or now - last_update >= PROGRESS_UPDATE_INTERVAL:
+                            self.progress_manager.update(progress, task_id, pending)
+                            pending = 0
+                            last_update = now
+                    self._finish_write(fd)
+                finally:
+                    os.close(fd)
+                if pending:
+                    self.progress_manager.update(progress, task_id, pending)
+
+    async def _download_html_async(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        save_path: Path,
+    ) -> None:
+        response = await client.get(url)
+        response.raise_for_status()
+        await asyncio.to_thread(save_path.write_text, response.text, encoding=self.config.encoding)
+
+    async def _download_binary_async(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        temp_path: Path,
+    ) -> None:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            chunks = response.aiter_bytes(self.config.chunk_size)
+            if AIOFile is not None:
+                async with AIOFile(str(temp_path), "wb") as afp:
+                    write = Writer(afp)
+                    async for chunk in chunks:
+                        await write(chunk)
+                    if self.config.fsync:
+                        await afp.fsync()
+                    self.file_handler.drop_page_cache(afp.fileno())
+                return
+            await self._write_chunks_in_thread(chunks, temp_path)
+
+    async def _write_chunks_in_thread(self, chunks: AsyncIterator[bytes], temp_path: Path) -> None:
+        """aiofileが無い場合は、1つのスレッドがキューから受け取って書き込み、イベントループを塞がない."""
+        chunk_queue: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        writer = asyncio.create_task(asyncio.to_thread(self._write_chunks, temp_path, chunk_queue))
+        try:
+            async for chunk in chunks:
+                # 書き込みが失敗していれば受信を打ち切り、下のawaitで例外を伝える
+                if writer.done():
+                    break
+                chunk_queue.put(chunk)
+        finally:
+            chunk_queue.put(None)
+            await writer
+
+    def _write_chunks(self, path: Path, chunk_queue: "queue.SimpleQueue[bytes | None]") -> None:
+        """キューから受け取ったチャンクを、Noneが届くまでファイルに書き込む."""
+        fd = self.file_handler.open_for_write(path)
+        try:
+            while (chunk := chunk_queue.get()) is not None:
+                self.file_handler.write_all(fd, chunk)
+            self._finish_write(fd)
+        finally:
+            os.close(fd)
+
+    def _finish_write(self, fd: int) -> None:
+        """書き込みの後処理. 設定された場合のみfsyncし、ページキャッシュの解放を通知する."""
+        if self.config.fsync:
+            os.fsync(fd)
+        self.file_handler.drop_page_cache(fd)
+
+    def _handle_unexpected_error(
+        self,
+        error: Exception,
+        temp_path: Path,
+        url: str,
+        save_path: Path,
+        log: Any,
+    ) -> None:
+        temp_path.unlink(missing_ok=True)
+        log.exception("unexpected_error", error=str(error))
+        self.record.add_error("unexpected", str(error), {"url": url, "path": str(save_path)})
 
     def _handle_download_error(
         self,
@@ -312,7 +555,8 @@ class Downloader:
         temp_path: Path,
         url: str,
         attempt: int,
-    ) -> None:
+    ) -> float:
+        """一時ファイルを削除し、再試行までの待機秒数を返す. 最終試行ではDownloadErrorを送出."""
         log = self.log.bind(
             url=url,
             attempt=attempt + 1,
@@ -320,17 +564,18 @@ class Downloader:
             error=str(error),
         )
 
-        if temp_path.exists():
-            temp_path.unlink()
+        temp_path.unlink(missing_ok=True)
 
         if attempt == self.config.retry_count - 1:
             log.error("download_failed_all_retries")
             msg = f"HTTPエラー: {error}, URL: {url}"
             raise DownloadError(msg)
 
-        retry_delay = self.config.retry_delay * (attempt + 1)
+        # 上限付きの指数バックオフに揺らぎ (0.5〜1.5倍) を加え、再試行の集中を避ける
+        backoff = min(self.config.max_retry_delay, self.config.retry_delay * 2**attempt)
+        retry_delay = backoff * (0.5 + random.random())  # noqa: S311
         log.warning("retry_download", retry_delay=retry_delay)
-        time.sleep(retry_delay)
+        return retry_delay
 
     @property
     def headers(self) -> Headers:
@@ -1,5 +1,6 @@
 import re
 from enum import Enum
+from functools import lru_cache
 from typing import Optional
 
 
@@ -34,18 +35,22 @@ class JapaneseCalendarConverter:
 
     ZENKAKU_DIGITS = "０１２３４５６７８９"
     HANKAKU_DIGITS = "0123456789"
-    TRANS_TABLE = str.maketrans(ZENKAKU_DIGITS, HANKAKU_DIGITS)
+    # 全角数字と全角スペースを1回のtranslateで半角に変換する
+    TRANS_TABLE = str.maketrans(ZENKAKU_DIGITS + "\u3000", HANKAKU_DIGITS + " ")
+
+    # 元年と漢数字の1年、一年も対応
+    YEAR_PATTERN = re.compile(r"(\d+|元|一|1)年")
+    FIRST_YEAR_TEXTS = frozenset(("元", "一", "1"))
 
     @classmethod
     def normalize_text(cls, text: str) -> str:
-        """テキストを正規化（全角数字を半角に変換）."""
-        text = text.translate(cls.TRANS_TABLE)
-        text = text.replace("　", " ").replace("年", "年")
-        return text
+        """テキストを正規化（全角数字・全角スペースを半角に変換）."""
+        return text.translate(cls.TRANS_TABLE)
 
     @classmethod
+    @lru_cache(maxsize=512)
     def to_western_year(cls, japanese_year: str) -> int | None:
-        """和暦を西暦に変換.
+        """和暦を西暦に変換. 同じ表記が繰り返し現れるため結果をキャッシュする.
 
         Args:
             japanese_year: 和暦の文字列 (例: "平成20年", "令和元年", "平成２０年")
@@ -60,15 +65,13 @@ class JapaneseCalendarConverter:
         if not era:
             return None
 
-        # 元年と漢数字の1年、一年も対応
-        year_pattern = r"(\d+|元|一|1)年"
-        year_match = re.search(year_pattern, japanese_year)
+        year_match = cls.YEAR_PATTERN.search(japanese_year)
         if not year_match:
             return None
 
         year_text = year_match.group(1)
         # 元年、一年、1年の場合は1に変換
-        era_year = 1 if year_text in ["元", "一", "1"] else int(year_text)
+        era_year = 1 if year_text in cls.FIRST_YEAR_TEXTS else int(year_text)
 
         return cls.ERA_START_YEAR[era] + era_year - 1
 
@@ -2,13 +2,26 @@
 This module uses structlog to configure logging.
 """
 
+import atexit
 import logging
+import queue
 import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
 from enum import IntEnum
+from io import TextIOWrapper
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from multiprocessing.context import BaseContext
+from multiprocessing.queues import Queue
 
 import structlog
 from structlog.dev import ConsoleRenderer
 from structlog.processors import JSONRenderer
+from structlog.processors import format_exc_info
+
+# 子プロセスから受け取ったレコードを書き出すハンドラ. configure_loggerで設定する
+_worker_record_handlers: list[logging.Handler] = []
 
 
 class LEVEL(IntEnum):
@@ -20,19 +33,67 @@ class LEVEL(IntEnum):
     FATAL = logging.FATAL
 
 
-def configure_logger(
-    logging_level: int | LEVEL = logging.WARNING,
-) -> None:
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging_level)
+class _PassthroughQueueHandler(QueueHandler):
+    """レコードを整形せずにキューへ渡すQueueHandler.
+
+    既定のprepareはメッセージを文字列化するため、structlogのイベント辞書を保ったまま渡す.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _WorkerQueueHandler(QueueHandler):
+    """子プロセスのレコードを親プロセスのキューへ渡すQueueHandler.
+
+    例外情報は子プロセスでしか参照できず、トレースバックはpickleできないため、送る前に文字列化する.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, dict):
+            event_dict = record.msg.copy()
+            record.msg = format_exc_info(None, record.levelname.lower(), event_dict)  # pyright: ignore[reportArgumentType]
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """64 KiBのバッファを介して書き込むFileHandler.
+
+    INFO以下のレコードはflushせず、バッファが満ちたときとclose時にまとめて書き出す.
+    異常終了時に失われないよう、WARNING以上のレコードは書き込み後すぐにflushする.
+    """
+
+    BUFFER_SIZE = 1 << 16
+
+    def _open(self) -> TextIOWrapper:
+        return open(  # noqa: PTH123
+            self.baseFilename,
+            self.mode,
+            buffering=self.BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        if record.levelno >= logging.WARNING and self.stream is not None:
+            self.stream.flush()
+
+    def flush(self) -> None:
+        pass
 
+
+def _configure_structlog() -> None:
     structlog.configure(
         processors=[
+            # レベル未満のイベントは以降の処理を行う前に破棄する
+            structlog.stdlib.filter_by_level,
             structlog.stdlib.add_log_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M.%S", utc=False),
-            structlog.processors.StackInfoRenderer(),
             structlog.processors.UnicodeDecoder(),
             structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
@@ -40,12 +101,59 @@ def configure_logger(
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
+
+
+def configure_logger(
+    logging_level: int | LEVEL = logging.WARNING,
+) -> None:
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging_level)
+
+    _configure_structlog()
     handler_stdout = logging.StreamHandler(sys.stdout)
     handler_stdout.setFormatter(structlog.stdlib.ProcessorFormatter(processor=ConsoleRenderer()))
 
-    handler_file = logging.FileHandler("application.log")
+    handler_file = BufferedFileHandler("application.log", encoding="utf-8")
     handler_file.setFormatter(structlog.stdlib.ProcessorFormatter(processor=JSONRenderer()))
 
+    # ファイルへの書き込みは別スレッドのリスナーに任せ、ログ呼び出し元をI/Oで待たせない
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler_file, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
     root_logger = logging.getLogger()
     root_logger.addHandler(handler_stdout)
-    root_logger.addHandler(handler_file)
+    root_logger.addHandler(_PassthroughQueueHandler(log_queue))
+    _worker_record_handlers[:] = [handler_stdout, handler_file]
+
+
+@contextmanager
+def worker_log_queue(mp_context: BaseContext) -> Iterator[Queue | None]:
+    """子プロセスのログを受け取るキュー. 受け取ったレコードは親プロセスのハンドラで書き出す.
+
+    ロガーが未設定の場合はNoneを返す.
+    """
+    if not _worker_record_handlers:
+        yield None
+        return
+
+    log_queue: Queue[logging.LogRecord] = mp_context.Queue()
+    listener = QueueListener(log_queue, *_worker_record_handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+        log_queue.close()
+
+
+def configure_worker_logger(log_queue: Queue | None, logging_level: int) -> None:
+    """子プロセス用のロガー設定. プロセスプールのinitializerとして使い、ログを親プロセスのキューへ送る."""
+    if log_queue is None:
+        return
+
+    _configure_structlog()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging_level)
+    root_logger.addHandler(_WorkerQueueHandler(log_queue))
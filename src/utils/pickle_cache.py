@@ -0,0 +1,44 @@
+"""pickle_cache.py: 生成コストの高いオブジェクトをpickleでディスクにキャッシュする.
+
+キャッシュには (キー, 値) を保存し、読み込み時にキーが一致した場合のみ値を返す.
+"""
+
+import pickle
+from pathlib import Path
+from typing import TypeVar
+
+import structlog
+
+logger = structlog.get_logger().bind(module="pickle_cache")
+
+T = TypeVar("T")
+
+
+def load_cache(cache_path: Path, key: object, value_type: type[T]) -> T | None:
+    """キーが一致し、値がvalue_typeのキャッシュを読み込む. 存在しない・キー不一致・破損時はNone."""
+    entry = _read_entry(cache_path)
+    if entry is None:
+        return None
+    cached_key, value = entry
+    if cached_key != key or not isinstance(value, value_type):
+        return None
+    return value
+
+
+def _read_entry(cache_path: Path) -> tuple[object, object] | None:
+    """キャッシュファイルから (キー, 値) を読み込む. 存在しない・破損時はNone."""
+    try:
+        cached_key, value = pickle.loads(cache_path.read_bytes())  # noqa: S301 自身が書き出したファイルのみ読む
+    except FileNotFoundError:
+        return None
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError) as e:
+        logger.warning("cache_load_failed", path=str(cache_path), error=str(e))
+        return None
+    return cached_key, value
+
+
+def save_cache(cache_path: Path, key: object, value: object) -> None:
+    """キャッシュを一時ファイル経由でアトミックに書き込む."""
+    temp_path = cache_path.with_name(cache_path.name + ".tmp")
+    temp_path.write_bytes(pickle.dumps((key, value), protocol=5))
+    temp_path.replace(cache_path)
@@ -1,4 +1,7 @@
+import asyncio
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from dataclasses import field
 from pathlib import Path
@@ -6,8 +9,8 @@ from typing import Any
 from urllib.parse import urljoin
 
 import structlog
-from bs4 import BeautifulSoup
-from bs4 import Tag
+from selectolax.lexbor import LexborHTMLParser
+from selectolax.lexbor import LexborNode
 
 from src.base_class import FileFormat
 from src.data_filter import DatasetCollection
@@ -15,6 +18,10 @@ from src.utils.downloader import Downloader
 
 logger = structlog.get_logger().bind(module="mlit")
 
+_CATALOG_RE = re.compile(r'<li class="collection-item">\s*<a href="([^"]+)">\s*(.+?)\s*</a>')
+# onclick="DownLd('サイズ', 'ファイル名', 'パス', this)" の3番目の引数 (パス) を取り出す
+_ONCLICK_PATH_RE = re.compile(r"'[^']*'\s*,\s*'[^']*'\s*,\s*'([^']+)'")
+
 
 @dataclass
 class CatalogItem:
@@ -24,85 +31,87 @@ class CatalogItem:
     relative_url: str
     title: str
     url: str = field(init=False)
+    html_name: str = field(init=False)
 
     def __post_init__(self):
         self.url = urljoin(self.BASE_URL, self.relative_url)
-
-    @property
-    def html_name(self) -> str:
-        return self.url.split("/")[-1]
+        self.html_name = self.url.rsplit("/", 1)[-1]
 
     def save_html(self, target_path: Path) -> None:
         """HTMLをダウンロードして保存."""
-        if target_path.exists():
+        if os.path.exists(target_path):  # noqa: PTH110
             logger.info("Catalog already exists", target_path=str(target_path))
             return
 
         target_path.parent.mkdir(parents=True, exist_ok=True)
-        Downloader().download(self.url, target_path, FileFormat.HTML)
+        with Downloader() as downloader:
+            downloader.download(self.url, target_path, FileFormat.HTML)
+
+    def _parse_table(self, table: LexborNode, html_path: Path) -> DatasetCollection:
+        """テーブルからデータを抽出.
 
-    def _parse_table(self, table: Tag, html_path: Path) -> DatasetCollection:
-        """テーブルからデータを抽出."""
-        headers = self._get_headers(table)
+        行は1回だけ走査し、各行のセルは子要素のみを見る. 先頭行の見出しをヘッダーとし、見出しを含む行は読み飛ばす.
+        """
+        headers: list[str] | None = None
         rows_data = []
 
-        for row in table.find_all("tr"):
-            if row_data := self._parse_row(row, headers):
-                rows_data.append(row_data)
+        for row in table.css("tr"):
+            cells = list(row.iter())
+            if headers is None:
+                headers = [cell.text().strip() for cell in cells if cell.tag == "th"]
+            if any(cell.tag == "th" for cell in cells):
+                continue
+            # ダウンロードリンクの無い行は、セルの文字列を取り出す前に読み飛ばす
+            if not (file_path := self._extract_file_path(row)):
+                continue
+            row_data = self._parse_row([cell for cell in cells if cell.tag == "td"], headers)
+            row_data["file_path"] = file_path
+            rows_data.append(row_data)
 
+        if headers is None:
+            msg = "テーブルヘッダーが見つかりません"
+            raise ValueError(msg)
         return DatasetCollection.from_dicts(rows_data, html_path)
 
     def parse_html(self, html_path: Path) -> DatasetCollection:
         """HTMLを解析して地理データセット情報を抽出."""
         try:
-            html_content = html_path.read_text()
+            # 保存済みHTMLはUTF-8のため、デコードせずバイト列のままパーサーへ渡す
+            html_content = html_path.read_bytes()
         except (FileNotFoundError, OSError) as e:
             msg = f"HTMLファイルの読み込みに失敗: {e}"
             raise type(e)(msg)
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        table = soup.select_one("main div table.mb30.responsive-table")
+        return self.parse_html_content(html_content, html_path)
+
+    def parse_html_content(self, html_content: bytes, html_path: Path) -> DatasetCollection:
+        """読み込み済みのHTMLを解析して地理データセット情報を抽出."""
+        tree = LexborHTMLParser(html_content)
+        table = tree.css_first("main div table.mb30.responsive-table")
         if not table:
             msg = "地理データテーブルが見つかりませんでした"
             raise ValueError(msg)
 
         return self._parse_table(table, html_path)
 
-    def _get_headers(self, table: Tag) -> list[str]:
-        """テーブルヘッダーを取得."""
-        header_row = table.find("tr")
-        if not header_row:
-            msg = "テーブルヘッダーが見つかりません"
-            raise ValueError(msg)
-        return [th.text.strip() for th in header_row.find_all("th")]  # pyright: ignore [reportAttributeAccessIssue]
-
-    def _parse_row(self, row: Tag, headers: list[str]) -> dict[str, Any]:
-        """行データを解析."""
-        if row.find("th"):
-            return {}
-
-        cells = row.find_all("td")
+    def _parse_row(self, cells: list[LexborNode], headers: list[str]) -> dict[str, Any]:
+        """行データ (td セル) を解析."""
         row_data = {}
 
         for header, cell in zip(headers, cells, strict=False):
             if header == "ダウンロード":
                 continue
-            row_data[header] = cell.text.strip()
-            if header == "region" and cell.get("id"):
-                row_data["region_id"] = cell["id"]
-
-        file_path = self._extract_file_path(cells)
-        if file_path:
-            row_data["file_path"] = file_path
-            return row_data
-        return {}
-
-    def _extract_file_path(self, cells: list[Tag]) -> str:
-        """セルからファイルパスを抽出."""
-        for cell in cells:
-            if (link := cell.find("a")) and (onclick := link.get("onclick")):  # pyright: ignore [reportAttributeAccessIssue]
-                if (args := re.findall(r"\'([^\']+)\'", onclick)) and len(args) >= 3:  # pyright: ignore
-                    return args[2]
+            row_data[header] = cell.text().strip()
+            if header == "region" and (cell_id := cell.attributes.get("id")):
+                row_data["region_id"] = cell_id
+        return row_data
+
+    def _extract_file_path(self, row: LexborNode) -> str:
+        """行のダウンロードリンク (onclick) からファイルパスを抽出."""
+        # onclickを持つリンクだけをセレクターで絞り込む
+        for link in row.css("td a[onclick]"):
+            if (onclick := link.attributes.get("onclick")) and (match := _ONCLICK_PATH_RE.search(onclick)):
+                return match[1]
         return ""
 
 
@@ -119,25 +128,48 @@ class CatalogManager:
 
     def _parse_catalogs(self, html_content: str) -> list[CatalogItem]:
         """HTMLからカタログ一覧を抽出."""
-        pattern = r'<li class="collection-item">\s*<a href="([^"]+)">\s*(.+?)\s*</a>'
-        return [CatalogItem(*match) for match in re.findall(pattern, html_content)]
+        return [CatalogItem(match[1], match[2]) for match in _CATALOG_RE.finditer(html_content)]
 
     def download_catalogs(self, output_dir: Path, download_all: bool = True) -> None:
-        """カタログをダウンロード."""
+        """カタログをダウンロード.
+
+        Jupyterなど既にイベントループが動いている環境では、別スレッドの新しいイベントループで実行する.
+        """
+        coroutine = self.download_catalogs_async(output_dir, download_all=download_all)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(coroutine)
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(asyncio.run, coroutine).result()
+
+    async def download_catalogs_async(self, output_dir: Path, *, download_all: bool = True) -> None:
+        """カタログを非同期にダウンロード."""
         target_catalogs = self.catalogs if download_all else self._select_catalogs()
 
+        items: list[tuple[str, Path]] = []
         for catalog in target_catalogs:
             catalog_path = output_dir / catalog.title / catalog.html_name
-            catalog.save_html(catalog_path)
-
-            if catalog.title == "都市計画決定情報（ポリゴン）":
-                logger.info("都市計画決定情報（ポリゴン）はスキップします")
+            if os.path.exists(catalog_path):  # noqa: PTH110
+                logger.info("Catalog already exists", target_path=str(catalog_path))
                 continue
+            items.append((catalog.url, catalog_path))
+
+        if not items:
+            return
+
+        # 通信待ちが大半のため、同時接続数を制限しつつ非同期にまとめて取得する
+        # HTMLの解析 (file_info.jsonの作成) はCatalogProcessorが並列に行う
+        with Downloader() as downloader:
+            results = await downloader.download_many(items, FileFormat.HTML, max_concurrency=16)
 
-            info_path = output_dir / catalog.title / "file_info.json"
-            if not info_path.exists():
-                dataset = catalog.parse_html(catalog_path)
-                dataset.save(info_path)
+        errors = [(url, error) for (url, _), error in zip(items, results, strict=True) if error is not None]
+        for url, error in errors:
+            logger.error("Catalog download failed", url=url, error=str(error))
+        if errors:
+            raise errors[0][1]
 
     def _select_catalogs(self) -> list[CatalogItem]:
         """ダウンロード対象のカタログを選択（カスタマイズ可能）."""
@@ -1,17 +1,69 @@
+import hashlib
 import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from dataclasses import dataclass
 from pathlib import Path
+from typing import NamedTuple
 
 import structlog
+import zstandard
+from rich.progress import Progress
 
+from src.data_filter import ZSTD_SUFFIX
 from src.data_filter import DatasetCollection
+from src.scrayper import Paths
 from src.scrayper import ScraypingConfig
 from src.scrayper import ScraypingManager
+from src.utils.downloader import Downloader
+from src.utils.downloader import ProgressManager
+from src.utils.logger_config import configure_worker_logger
+from src.utils.logger_config import worker_log_queue
+from src.utils.pickle_cache import load_cache
+from src.utils.pickle_cache import save_cache
 from src.web_catalog import CatalogItem
 from src.web_catalog import CatalogManager
 
 logger = structlog.get_logger().bind(module="mlit")
 
+FILE_INFO_NAME = "file_info.json"
+REDUCED_FILE_INFO_NAME = "reduced_file_info.json"
+
+# GeographicDataset / DatasetCollection の構造を変更した場合は更新し、古い解析キャッシュを無効化する
+PARSE_CACHE_VERSION = 1
+
+
+def _parse_catalog_html(catalog: CatalogItem, html_path: Path) -> DatasetCollection:
+    """カタログHTMLを解析. プロセスプールから呼び出すためモジュールレベルに置く.
+
+    解析結果はHTMLの内容のハッシュをキーにキャッシュし、同じHTMLは再解析しない.
+    """
+    html_content = html_path.read_bytes()
+    cache_path = html_path.with_suffix(".parse.pkl")
+    cache_key = (PARSE_CACHE_VERSION, str(html_path), hashlib.sha256(html_content).hexdigest())
+
+    if (collection := load_cache(cache_path, cache_key, DatasetCollection)) is not None:
+        logger.info("Loaded parsed catalog from cache", cache_path=str(cache_path))
+        return collection
+
+    collection = catalog.parse_html_content(html_content, html_path)
+    save_cache(cache_path, cache_key, collection)
+    return collection
+
+
+class _SharedDownload(NamedTuple):
+    """全カタログのダウンロードで共有するDownloader・スレッドプール・進捗表示."""
+
+    downloader: Downloader
+    executor: ThreadPoolExecutor
+    progress: Progress
+
 
 @dataclass
 class ProcessingResult:
@@ -25,83 +77,187 @@ class ProcessingResult:
 class CatalogProcessor:
     """Handles catalog data processing and file creation."""
 
-    def __init__(self, manager: CatalogManager, paths: dict[str, Path], config: ScraypingConfig) -> None:
+    def __init__(self, manager: CatalogManager, paths: Paths, config: ScraypingConfig) -> None:
         self.manager = manager
         self.paths = paths
         self.config = config
+        self._catalog_dirs: dict[str, Path] = {}
 
-    def process_catalog_files(self) -> None:
-        """Process all catalog files."""
-        if not self.config.is_dry_run:
-            self.create_raw_catalog_info()
-            self.create_reduce_target_json()
-            self.download_target_data()
+    def _catalog_dir(self, title: str) -> Path:
+        """カタログごとのディレクトリ. 同じパスを繰り返し組み立てないようキャッシュする."""
+        if (catalog_dir := self._catalog_dirs.get(title)) is None:
+            catalog_dir = self._catalog_dirs[title] = self.paths.catalogs / title
+        return catalog_dir
 
-    def create_raw_catalog_info(self) -> None:
-        """Create raw catalog information JSON files."""
-        for catalog in self.manager.catalogs:
-            if catalog.title == ScraypingManager.SKIP_CATALOG_TITLE:
-                logger.info("Skipping polygon data catalog")
-                continue
+    def _info_path(self, title: str, name: str) -> Path:
+        """カタログ情報の保存先. zstdで圧縮して保存する."""
+        return self._catalog_dir(title) / (name + ZSTD_SUFFIX)
 
-            info_path = self.paths["catalogs"] / catalog.title / "file_info.json"
-            info_path.parent.mkdir(parents=True, exist_ok=True)
+    def _existing_info_path(self, title: str, name: str) -> Path | None:
+        """既存のカタログ情報のパス. 圧縮版が無ければ従来の非圧縮JSONを探す."""
+        catalog_dir = self._catalog_dir(title)
+        for path in (catalog_dir / (name + ZSTD_SUFFIX), catalog_dir / name):
+            if os.path.exists(path):  # noqa: PTH110
+                return path
+        return None
 
-            self._process_catalog_info(catalog, info_path)
+    def process_catalog_files(self, max_download_workers: int = 4, max_connections: int = 16) -> None:
+        """全カタログを処理.
 
-    def create_reduce_target_json(self) -> None:
-        """Create reduced target JSON files."""
-        for catalog in self.manager.catalogs:
-            if catalog.title == ScraypingManager.SKIP_CATALOG_TITLE:
-                logger.info("Skipping polygon data catalog")
-                continue
+        カタログごとに 情報の作成 → 絞り込み → ダウンロード開始 を続けて行う.
+        HTMLの解析はプロセスプールで先行して並列に進め、ダウンロードはスレッドプールで並行させる.
+        ファイルのダウンロードは全カタログで1つのスレッドプールを共有し、同時接続数をmax_connectionsまでに抑える.
+        """
+        catalogs = self._active_catalogs()
+        self._create_catalog_dirs(catalogs)
+        if self.config.is_dry_run:
+            self._create_catalog_infos(catalogs)
+            return
+
+        # 親プロセスはログ用のスレッドを持つためforkせずにspawnで起動し、子プロセスのログはキュー経由で親へ集める
+        mp_context = multiprocessing.get_context("spawn")
+        # 終了時はスレッドプールの完了を待ってから進捗表示を止め、Downloaderを閉じる
+        with (
+            worker_log_queue(mp_context) as log_queue,
+            ProcessPoolExecutor(
+                mp_context=mp_context,
+                initializer=configure_worker_logger,
+                initargs=(log_queue, logging.getLogger().level),
+            ) as parse_executor,
+            Downloader(progress_manager=ProgressManager(disable=True)) as downloader,
+            DatasetCollection.create_progress() as progress,
+            ThreadPoolExecutor(max_workers=max_download_workers) as download_executor,
+            ThreadPoolExecutor(max_workers=max_connections) as file_executor,
+        ):
+            try:
+                self._run_catalogs(
+                    catalogs,
+                    parse_executor,
+                    download_executor,
+                    _SharedDownload(downloader, file_executor, progress),
+                )
+            except BaseException:
+                self._cancel_pending(parse_executor, download_executor, file_executor)
+                raise
+
+    @staticmethod
+    def _cancel_pending(*executors: Executor) -> None:
+        """未着手の解析・ダウンロードを取り消す. 以降は実行中の処理の終了だけを待つ."""
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_catalogs(
+        self,
+        catalogs: list[CatalogItem],
+        parse_executor: ProcessPoolExecutor,
+        download_executor: ThreadPoolExecutor,
+        shared_download: _SharedDownload,
+    ) -> None:
+        """カタログごとに 情報の作成 → 絞り込み → ダウンロードの投入 を行い、全ダウンロードの完了を待つ."""
+        parse_futures = self._submit_parses(catalogs, parse_executor)
+        download_futures = []
+        for catalog in catalogs:
+            # 作成・読み込み済みのコレクションはファイルを経由せずに次の段階へ渡す
+            raw_collection = self._process_catalog_info(catalog, parse_futures.get(catalog.title))
+            reduced_collection = self._process_reduced_info(catalog, raw_collection)
+            download_futures.append(
+                download_executor.submit(self._download_one, catalog, reduced_collection, shared_download),
+            )
+
+        for future in as_completed(download_futures):
+            future.result()
 
-            self._process_reduced_info(catalog)
+    def _create_catalog_infos(self, catalogs: list[CatalogItem]) -> None:
+        """ドライラン用. file_infoが無いカタログの情報だけを作成し、絞り込み・ダウンロードは行わない."""
+        for catalog in catalogs:
+            if self._existing_info_path(catalog.title, FILE_INFO_NAME) is None:
+                self._process_catalog_info(catalog, None)
 
-    def download_target_data(self) -> None:
-        """Download target data files."""
+    def _active_catalogs(self) -> list[CatalogItem]:
+        """処理対象のカタログ (スキップ対象を除く)."""
+        catalogs = []
         for catalog in self.manager.catalogs:
             if catalog.title == ScraypingManager.SKIP_CATALOG_TITLE:
                 logger.info("Skipping polygon data catalog")
                 continue
+            catalogs.append(catalog)
+        return catalogs
 
-            reduced_path = self.paths["catalogs"] / catalog.title / "reduced_file_info.json"
-            try:
-                collection = DatasetCollection.load(reduced_path)
-
-                logger.info(
-                    "Starting download",
-                    catalog_title=catalog.title,
-                    total_items=len(collection.items),
-                )
+    def _create_catalog_dirs(self, catalogs: list[CatalogItem]) -> None:
+        """処理対象のカタログのディレクトリを最初にまとめて作成."""
+        for catalog_dir in {self._catalog_dir(catalog.title) for catalog in catalogs}:
+            catalog_dir.mkdir(parents=True, exist_ok=True)
 
-                collection.download()
-                logger.info("Download completed", catalog_title=catalog.title)
+    def _submit_parses(
+        self,
+        catalogs: list[CatalogItem],
+        executor: ProcessPoolExecutor,
+    ) -> dict[str, Future[DatasetCollection]]:
+        """file_info.jsonが無いカタログのHTML解析をプロセスプールに投入."""
+        # HTMLの解析はCPUバウンドで互いに独立しているため、プロセスを分けて並列に行う
+        futures: dict[str, Future[DatasetCollection]] = {}
+        for catalog in catalogs:
+            if self._existing_info_path(catalog.title, FILE_INFO_NAME) is None:
+                html_path = self._catalog_dir(catalog.title) / catalog.html_name
+                futures[catalog.title] = executor.submit(_parse_catalog_html, catalog, html_path)
+        return futures
 
-            except Exception as e:
-                logger.exception(
-                    "Download error occurred",
-                    error=str(e),
-                    catalog_title=catalog.title,
+    def _download_one(
+        self,
+        catalog: CatalogItem,
+        collection: DatasetCollection | None,
+        shared_download: _SharedDownload,
+    ) -> None:
+        """1つのカタログのデータをダウンロード. コレクションが渡されない場合はreduced_file_infoを読み込む."""
+        try:
+            if collection is None:
+                reduced_path = self._existing_info_path(catalog.title, REDUCED_FILE_INFO_NAME) or self._info_path(
+                    catalog.title,
+                    REDUCED_FILE_INFO_NAME,
                 )
-                raise
-
-    def _process_catalog_info(self, catalog: CatalogItem, info_path: Path) -> None:
-        """Process individual catalog information."""
-        existing_collection = self._load_existing_collection(info_path)
+                collection = DatasetCollection.load(reduced_path)
 
-        if existing_collection:
             logger.info(
-                "Loaded existing data",
+                "Starting download",
                 catalog_title=catalog.title,
-                items=len(existing_collection.items),
-                info_path=info_path,
+                total_items=len(collection.items),
             )
-            return
+
+            collection.download(
+                shared_download.downloader,
+                executor=shared_download.executor,
+                progress=shared_download.progress,
+            )
+            logger.info("Download completed", catalog_title=catalog.title)
+
+        except Exception as e:
+            logger.exception(
+                "Download error occurred",
+                error=str(e),
+                catalog_title=catalog.title,
+            )
+            raise
+
+    def _process_catalog_info(
+        self,
+        catalog: CatalogItem,
+        future: Future[DatasetCollection] | None,
+    ) -> DatasetCollection:
+        """解析結果からカタログ情報 (file_info) を作成. 既存ファイルがあればそれを読み込んで使う."""
+        info_path = self._info_path(catalog.title, FILE_INFO_NAME)
+        existing_path = self._existing_info_path(catalog.title, FILE_INFO_NAME) or info_path
+        if future is None and (existing_collection := self._load_existing_collection(existing_path)):
+            return existing_collection
+
         try:
-            html_path = self.paths["catalogs"] / catalog.title / catalog.html_name
-            new_collection = catalog.parse_html(html_path)
-            new_collection.save(info_path)
+            # 既存ファイルが読めなかった場合は、この場で解析し直す
+            new_collection = (
+                future.result()
+                if future is not None
+                else _parse_catalog_html(catalog, self._catalog_dir(catalog.title) / catalog.html_name)
+            )
+            # 保存時に重複を除いたコレクションを使い、ファイルの内容と揃える
+            new_collection = new_collection.save(info_path)
 
         except Exception as e:
             logger.exception(
@@ -111,24 +267,25 @@ class CatalogProcessor:
                 info_path=info_path,
             )
             raise
+        return new_collection
 
-    def _process_reduced_info(self, catalog: CatalogItem) -> None:
-        """Process reduced information for a catalog."""
-        file_info_path = self.paths["catalogs"] / catalog.title / "file_info.json"
-        reduced_path = self.paths["catalogs"] / catalog.title / "reduced_file_info.json"
-        reduced_path.parent.mkdir(parents=True, exist_ok=True)
-        if reduced_path.exists():
+    def _process_reduced_info(
+        self,
+        catalog: CatalogItem,
+        raw_collection: DatasetCollection,
+    ) -> DatasetCollection | None:
+        """カタログの絞り込み情報 (reduced_file_info) を作成. 既存ファイルを残す場合はNoneを返す."""
+        reduced_path = self._info_path(catalog.title, REDUCED_FILE_INFO_NAME)
+        if self._existing_info_path(catalog.title, REDUCED_FILE_INFO_NAME) is not None:
             logger.info("Skip generating reduced_file_info", catalog_title=catalog.title)
-            return
+            return None
 
         try:
-            raw_collection = DatasetCollection.load(file_info_path)
-
             new_reduced = raw_collection.reduce_data(
                 self.config.latest_year_only,
                 self.config.prefer_formats,
             )
-            new_reduced.save(reduced_path)
+            new_reduced = new_reduced.save(reduced_path)
 
             logger.info(
                 "Saved reduced data",
@@ -143,11 +300,16 @@ class CatalogProcessor:
                 catalog_title=catalog.title,
             )
             raise
+        return new_reduced
 
     @staticmethod
     def _load_existing_collection(path: Path) -> DatasetCollection | None:
         """Load existing dataset collection if available."""
-        if not path.exists():
+        # 1回のstatで存在と空ファイルを判定する
+        try:
+            if os.stat(path).st_size == 0:  # noqa: PTH116
+                return None
+        except FileNotFoundError:
             return None
 
         try:
@@ -158,7 +320,7 @@ class CatalogProcessor:
                 items=len(collection.items),
             )
             return collection
-        except (json.JSONDecodeError, ValueError) as e:
+        except (json.JSONDecodeError, ValueError, zstandard.ZstdError) as e:
             logger.warning(
                 "Failed to load existing data",
                 error=str(e),
@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+import pytest
+from src.base_class import FileFormat
+from src.base_class import RegionType
+from src.data_filter import DatasetCollection
+from src.data_filter import GeographicDataset
+
+
+def _dataset(tmp_path: Path, filename: str = "A13-20_13_GML.zip", region: str = "東京") -> GeographicDataset:
+    return GeographicDataset(
+        category="森林地域",
+        filename=filename,
+        file_size="1.2MB",
+        region=region,
+        year=2020,
+        geodetic_system="世界測地系",
+        file_url=f"https://nlftp.mlit.go.jp/ksj/gml/data/A13/{filename}",
+        local_html=str(tmp_path / "catalogs" / "森林地域" / "KsjTmplt-A13.html"),
+    )
+
+
+@pytest.mark.parametrize("name", ["file_info.json", "file_info.json.zst"])
+def test_save_load_round_trip(tmp_path: Path, name: str) -> None:
+    """.json / .json.zst のどちらでも保存した内容をそのまま読み込める."""
+    collection = DatasetCollection([_dataset(tmp_path), _dataset(tmp_path, "A13-20_01_GML.zip", "北海道")])
+    path = tmp_path / name
+
+    saved = collection.save(path)
+    loaded = DatasetCollection.load(path)
+
+    assert loaded.items == collection.items
+    assert saved.items == collection.items
+    assert [item.format for item in loaded] == [FileFormat.GML, FileFormat.GML]
+    assert [item.region_type for item in loaded] == [RegionType.PREFECTURAL, RegionType.PREFECTURAL]
+
+
+def test_save_writes_enum_labels_like_baseline(tmp_path: Path) -> None:
+    """列挙値は従来どおり "FileFormat.GML" の形式で保存する."""
+    path = tmp_path / "file_info.json"
+    DatasetCollection([_dataset(tmp_path)]).save(path)
+
+    (record,) = json.loads(path.read_text(encoding="utf-8"))
+    assert record["_format"] == "FileFormat.GML"
+    assert record["_region_type"] == "RegionType.PREFECTURAL"
+
+
+def test_save_deduplicates_repeated_rows(tmp_path: Path) -> None:
+    """同じ行が重複していても、保存内容と戻り値は1件にまとまる."""
+    path = tmp_path / "file_info.json.zst"
+    saved = DatasetCollection([_dataset(tmp_path), _dataset(tmp_path)]).save(path)
+
+    assert len(saved) == 1
+    assert len(DatasetCollection.load(path)) == 1
+
+
+def test_load_baseline_format(tmp_path: Path) -> None:
+    """従来の形式 (非圧縮・"FileFormat.X" 表記・導出フィールド付き) のファイルを読み込める."""
+    local_html = tmp_path / "catalogs" / "森林地域" / "KsjTmplt-A13.html"
+    record = {
+        "category": "森林地域",
+        "filename": "A13-20_13_GML.zip",
+        "file_size": "1.2MB",
+        "region": "東京",
+        "year": 2020,
+        "geodetic_system": "世界測地系",
+        "file_url": "https://nlftp.mlit.go.jp/ksj/gml/data/A13/A13-20_13_GML.zip",
+        "detail_url": "https://nlftp.mlit.go.jp/ksj/gml/datalist/KsjTmplt-A13.html",
+        "local_html": str(local_html),
+        "download_path": str(tmp_path / "raw_data" / "森林地域" / "A13-20_13_GML.zip"),
+        "_format": "FileFormat.GML",
+        "_region_type": "RegionType.PREFECTURAL",
+    }
+    path = tmp_path / "file_info.json"
+    path.write_text(json.dumps([record], ensure_ascii=False, indent=2), encoding="utf-8")
+
+    (dataset,) = DatasetCollection.load(path)
+
+    assert dataset == _dataset(tmp_path)
+    assert dataset.format == FileFormat.GML
+    assert dataset.region_type == RegionType.PREFECTURAL
+    assert dataset.detail_url == record["detail_url"]
+    assert dataset.download_path == record["download_path"]
+
+    # 既存の従来形式ファイルへの保存では、同じデータセットを重複させない
+    merged = DatasetCollection([_dataset(tmp_path), _dataset(tmp_path, "A13-20_01_GML.zip", "北海道")]).save(path)
+    assert [item.filename for item in merged] == ["A13-20_13_GML.zip", "A13-20_01_GML.zip"]
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from src.scrayper import ScraypingConfig
+from src.scrayper import ScraypingManager
+from src.web_catalog import CatalogManager
+from src.web_process import FILE_INFO_NAME
+from src.web_process import CatalogProcessor
+
+
+def _processor(tmp_path: Path) -> CatalogProcessor:
+    config = ScraypingConfig(data_dir=tmp_path)
+    manager = ScraypingManager(config, None)
+    return CatalogProcessor(CatalogManager(""), manager.paths, config)
+
+
+def test_existing_info_path_prefers_compressed(tmp_path: Path) -> None:
+    """圧縮版と従来の非圧縮JSONが並んでいる場合は、圧縮版を使う."""
+    processor = _processor(tmp_path)
+    existing_info_path = processor._existing_info_path  # noqa: SLF001
+    catalog_dir = processor.paths.catalogs / "森林地域"
+    catalog_dir.mkdir(parents=True)
+
+    assert existing_info_path("森林地域", FILE_INFO_NAME) is None
+
+    (catalog_dir / FILE_INFO_NAME).write_text("[]", encoding="utf-8")
+    assert existing_info_path("森林地域", FILE_INFO_NAME) == catalog_dir / FILE_INFO_NAME
+
+    (catalog_dir / (FILE_INFO_NAME + ".zst")).write_bytes(b"")
+    assert existing_info_path("森林地域", FILE_INFO_NAME) == catalog_dir / (FILE_INFO_NAME + ".zst")